@@ -0,0 +1,53 @@
+import datetime as dt
+import math
+import xml.etree.ElementTree as StdET
+from treas_analyzer import main
+from treas_analyzer.main import parse_feed, MATURITY_ORDER
+
+FEED = """<?xml version="1.0" encoding="utf-8" standalone="yes"?>
+<feed xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices"
+      xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"
+      xmlns="http://www.w3.org/2005/Atom">
+  <title type="text">DailyTreasuryYieldCurveRateData</title>
+  <entry>
+    <content type="application/xml">
+      <m:properties>
+        <d:NEW_DATE m:type="Edm.DateTime">2025-08-04T00:00:00</d:NEW_DATE>
+        <d:BC_1MONTH m:type="Edm.Double">4.41</d:BC_1MONTH>
+        <d:BC_2MONTH m:type="Edm.Double" m:null="true" />
+        <d:BC_10YEAR m:type="Edm.Double">4.22</d:BC_10YEAR>
+      </m:properties>
+    </content>
+  </entry>
+  <entry>
+    <content type="application/xml">
+      <m:properties>
+        <d:NEW_DATE m:type="Edm.DateTime">2025-08-01T00:00:00</d:NEW_DATE>
+        <d:BC_1MONTH m:type="Edm.Double">4.40</d:BC_1MONTH>
+        <d:BC_2MONTH m:type="Edm.Double">4.35</d:BC_2MONTH>
+        <d:BC_10YEAR m:type="Edm.Double">4.23</d:BC_10YEAR>
+      </m:properties>
+    </content>
+  </entry>
+</feed>
+"""
+
+
+def test_parse_feed_rows_and_values():
+    df = parse_feed(FEED)
+    assert list(df.columns) == ["Date"] + MATURITY_ORDER
+    # Rows come back in date order regardless of feed order
+    assert df["Date"].dtype.kind == "M"
+    assert list(df["Date"].dt.date) == [dt.date(2025, 8, 1), dt.date(2025, 8, 4)]
+    assert df["1M"].tolist() == [4.40, 4.41]
+    assert df["10Y"].tolist() == [4.23, 4.22]
+    # Null and missing fields parse as NaN
+    assert math.isnan(df["2M"].iloc[1])
+    assert df["30Y"].isna().all()
+
+
+def test_parse_feed_stdlib_fallback_matches(monkeypatch):
+    expected = parse_feed(FEED)
+    monkeypatch.setattr(main, "ET", StdET)
+    monkeypatch.setattr(main, "_HAVE_LXML", False)
+    assert parse_feed(FEED).equals(expected)
@@ -0,0 +1,25 @@
+import math
+import numpy as np
+import pandas as pd
+from treas_analyzer.main import compute_trend, compute_trends
+
+
+def test_vectorized_trends_match_per_series():
+    dates = pd.Series(pd.date_range('2025-08-01', periods=8, freq='D').date)
+    a = pd.Series([4.0, 4.1, 4.05, 4.2, 4.3, 4.25, 4.4, 4.5])
+    b = pd.Series([3.0, np.nan, 2.9, 2.95, np.nan, 2.8, 2.7, 2.75])
+    c = pd.Series([np.nan, np.nan, 5.0, 5.1, np.nan, np.nan, np.nan, np.nan])  # too few points
+
+    x = np.array([d.toordinal() for d in dates], dtype=np.float64)
+    Y = np.column_stack([a, b, c]).astype(np.float64)
+    trends = compute_trends(x, Y)
+
+    for series, tr in zip([a, b], trends[:2]):
+        expected = compute_trend(dates, series)
+        assert math.isclose(tr.slope_per_day, expected.slope_per_day, rel_tol=1e-9)
+        assert math.isclose(tr.r2, expected.r2, rel_tol=1e-9)
+        mask = series.notna().to_numpy()
+        slope, _ = np.polyfit(x[mask], series.to_numpy()[mask], 1)
+        assert math.isclose(tr.slope_per_day, slope, rel_tol=1e-6)
+    assert trends[2] is None
+    assert compute_trend(dates, c) is None
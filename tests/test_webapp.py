@@ -0,0 +1,314 @@
+import datetime as dt
+import importlib
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+os.environ.setdefault("DISABLE_STARTUP_REGENERATE", "1")
+
+import pandas as pd
+import pytest
+from cachetools import TTLCache
+from treas_analyzer import main
+from treas_analyzer.main import build_month_arg, save_yields, write_generated_marker, MATURITY_FIELDS, MATURITY_ORDER
+
+webapp_app = importlib.import_module("webapp.app")
+_POPEN = subprocess.Popen
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(webapp_app, "OUT_DIR", tmp_path.as_posix())
+    dates = pd.date_range('2025-08-01', periods=5, freq='D').date
+    data = {'Date': dates}
+    for m in MATURITY_ORDER:
+        data[m] = [4.0] * len(dates)
+    save_yields(pd.DataFrame(data), (tmp_path / "yields_202508.csv").as_posix())
+    return webapp_app.app.test_client()
+
+
+def test_health(client):
+    r = client.get("/healthz")
+    assert r.status_code == 200
+    assert r.get_json()["status"] == "ok"
+
+
+def test_invest_uses_cached_yields(client):
+    r = client.get("/invest?month=202508&amount=10000")
+    assert r.status_code == 200
+    html = r.data.decode()
+    # 10Y at 4.00%: 10,000 * 0.04 * 10 = 4,000 interest
+    assert "$4000.00" in html
+    assert "$14000.00" in html
+    assert "2025-08-05" in html
+
+
+@pytest.mark.parametrize("ym", [None, "", "202513", "202500", "189912", "2025-08", "202508\n"])
+def test_month_param_falls_back_to_current_month(ym):
+    assert webapp_app._month_param(ym) == build_month_arg(None)
+
+
+def test_month_param_accepts_valid_month():
+    assert webapp_app._month_param("199001") == "199001"
+    assert webapp_app._month_param("202508") == "202508"
+
+
+class QueuedExecutor:
+    """Stand-in for the app's executor: jobs run only when the test calls run()."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args, **kwargs):
+        fut = Future()
+        self.jobs.append((fut, fn, args, kwargs))
+        return fut
+
+    def run(self):
+        while self.jobs:
+            fut, fn, args, kwargs = self.jobs.pop(0)
+            fut.set_result(fn(*args, **kwargs))
+
+
+@pytest.fixture
+def background(tmp_path, monkeypatch):
+    """Fresh per-process state, a queued executor, and plot stubs that write files."""
+    monkeypatch.delenv("K_SERVICE", raising=False)
+    monkeypatch.setattr(webapp_app, "_cache", TTLCache(maxsize=10, ttl=1800))
+    monkeypatch.setattr(webapp_app, "_REGEN_IN_FLIGHT", set())
+    monkeypatch.setattr(webapp_app, "_YTD_ATTEMPTED", set())
+    executor = QueuedExecutor()
+    monkeypatch.setattr(webapp_app, "_executor", executor)
+
+    def touch(name):
+        (tmp_path / name).write_bytes(b"png")
+
+    monkeypatch.setattr(webapp_app, "build_ytd_df", lambda ym, **kw: None)
+    monkeypatch.setattr(webapp_app, "plot_ytd", lambda df, out, ym, show=False: touch(f"yields_ytd_{ym[:4]}.png"))
+    monkeypatch.setattr(
+        webapp_app,
+        "plot_all",
+        lambda df, out, ym, show=False: [touch(f"yields_{k}_{ym}.png") for k in ("all", "facets")],
+    )
+    return executor
+
+
+def test_missing_ytd_plot_is_pending_until_built(client, background, tmp_path):
+    for name in ("yields_all_202508.png", "yields_facets_202508.png"):
+        (tmp_path / name).write_bytes(b"png")
+    write_generated_marker(tmp_path.as_posix(), "202508")
+
+    r = client.get("/?month=202508")
+    html = r.data.decode()
+    assert [job[1] for job in background.jobs] == [webapp_app._build_ytd_plot]
+    assert 'http-equiv="refresh"' in html
+    assert "yields_ytd_2025" not in html
+    assert webapp_app.cache_key("202508") not in webapp_app._cache
+
+    background.run()
+    html = client.get("/?month=202508").data.decode()
+    assert "yields_ytd_2025" in html
+    assert 'http-equiv="refresh"' not in html
+    assert webapp_app.cache_key("202508") in webapp_app._cache
+    assert background.jobs == []
+
+
+def _feed(days):
+    fields = "".join(f'<d:{f} m:type="Edm.Double">4.50</d:{f}>' for f in MATURITY_FIELDS)
+    entries = "".join(
+        f'<entry><content type="application/xml"><m:properties>'
+        f'<d:NEW_DATE m:type="Edm.DateTime">{d}T00:00:00</d:NEW_DATE>{fields}'
+        f"</m:properties></content></entry>"
+        for d in days
+    )
+    return (
+        '<feed xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices"'
+        ' xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"'
+        f' xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+    )
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Serve days 1-8 of the requested month from a stub feed; records each fetch."""
+    calls = []
+
+    def fake_fetch(url, verify_ssl=True, session=None):
+        calls.append(url)
+        ym = url[-6:]
+        return _feed([f"{ym[:4]}-{ym[4:]}-0{d}" for d in range(1, 9)])
+
+    monkeypatch.setattr(webapp_app, "fetch_xml", fake_fetch)
+    return calls
+
+
+def _img_src(html, name):
+    return re.search(rf'src="(/plots/{name}\?v=\d+)"', html).group(1)
+
+
+def test_stale_month_served_while_refreshed_once(client, background, fetches, tmp_path, monkeypatch):
+    out = tmp_path.as_posix()
+    for name in ("yields_all_202508.png", "yields_facets_202508.png", "yields_ytd_2025.png"):
+        (tmp_path / name).write_bytes(b"png")
+        os.utime(tmp_path / name, (1754000000, 1754000000))
+    now = dt.datetime(2025, 8, 8, 13, 0, tzinfo=main._ET_TZ)
+    monkeypatch.setattr(main, "_et_now", lambda: now)
+    write_generated_marker(out, "202508", when_et=now - dt.timedelta(days=1))
+
+    # Past noon ET and not generated today: both requests get the cached CSV at once
+    for _ in range(2):
+        html = client.get("/?month=202508").data.decode()
+        assert "Latest data: 2025-08-05" in html
+        assert 'http-equiv="refresh"' in html
+    stale_src = _img_src(html, "yields_all_202508.png")
+    assert [job[1] for job in background.jobs] == [webapp_app._refresh_month]
+    assert fetches == []
+    assert webapp_app.cache_key("202508") not in webapp_app._cache
+
+    background.run()
+    assert len(fetches) == 1
+    html = client.get("/?month=202508").data.decode()
+    assert "Latest data: 2025-08-08" in html
+    assert 'http-equiv="refresh"' not in html
+    assert webapp_app.cache_key("202508") in webapp_app._cache
+    # The rewritten plot gets a new URL, so cached copies of the stale one aren't reused
+    assert _img_src(html, "yields_all_202508.png") != stale_src
+
+
+def test_new_month_plots_in_background_without_duplicate_refresh(client, background, fetches, monkeypatch):
+    racing = []
+    save_df = webapp_app._save_df
+
+    def save_then_race(csv_path, df):
+        entry = save_df(csv_path, df)
+        # A concurrent request arriving once the CSV exists but before any plots do
+        if not racing:
+            racing.append(client.get("/?month=202507").data.decode())
+        return entry
+
+    monkeypatch.setattr(webapp_app, "_save_df", save_then_race)
+
+    # No CSV for 202507: the first request fetches inline and queues the plots
+    html = client.get("/?month=202507").data.decode()
+    assert 'http-equiv="refresh"' in racing[0]
+    assert len(fetches) == 1
+    assert "Latest data: 2025-07-08" in html
+    assert 'http-equiv="refresh"' in html
+    assert [job[1] for job in background.jobs] == [webapp_app.build_ytd_df, webapp_app._plot_month]
+
+    # The CSV now exists without its plots; later requests wait on the same job
+    html = client.get("/?month=202507").data.decode()
+    assert 'http-equiv="refresh"' in html
+    assert len(background.jobs) == 2
+    assert webapp_app.cache_key("202507") not in webapp_app._cache
+
+    background.run()
+    html = client.get("/?month=202507").data.decode()
+    assert len(fetches) == 1
+    assert "yields_all_202507.png" in html
+    assert 'http-equiv="refresh"' not in html
+    assert webapp_app.cache_key("202507") in webapp_app._cache
+
+
+@pytest.fixture
+def startup(tmp_path, monkeypatch):
+    """Fresh startup-regeneration state with the lock file under tmp_path."""
+    monkeypatch.setattr(webapp_app, "OUT_DIR", tmp_path.as_posix())
+    monkeypatch.setattr(webapp_app, "REGEN_LOCK_PATH", (tmp_path / ".regen.lock").as_posix())
+    monkeypatch.setattr(webapp_app, "_ready", False)
+    monkeypatch.setattr(webapp_app, "_regen_proc", None)
+    monkeypatch.setattr(webapp_app, "_regen_owner_pid", 0)
+    monkeypatch.setattr(webapp_app, "_regen_elsewhere", False)
+    spawned = []
+    monkeypatch.setattr(webapp_app.subprocess, "Popen", lambda *a, **kw: spawned.append(a) or SimpleNamespace(pid=0))
+    for name in ("DISABLE_STARTUP_REGENERATE", "READ_ONLY", "STARTUP_MAX_AGE", "K_SERVICE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("STARTUP_MONTH", "202508")
+    return spawned
+
+
+def test_forked_worker_tracks_regen_through_lock(startup, monkeypatch):
+    pytest.importorskip("fcntl")
+    # Stand in for the CLI: a child that keeps the inherited lock until its stdin closes
+    monkeypatch.setattr(
+        webapp_app.subprocess,
+        "Popen",
+        lambda args, **kw: _POPEN(
+            [sys.executable, "-c", "import sys; sys.stdin.read()"], stdin=subprocess.PIPE, **kw
+        ),
+    )
+    webapp_app._run_regen_optimized("202508")
+    child = webapp_app._regen_proc
+    try:
+        # As seen from a worker forked after the spawn (gunicorn --preload)
+        monkeypatch.setattr(webapp_app, "_regen_owner_pid", 0)
+        assert not webapp_app._check_ready()
+        assert not webapp_app._check_ready()
+    finally:
+        child.stdin.close()
+        child.wait()
+    assert webapp_app._check_ready()
+
+
+def test_second_regen_skips_while_lock_held(startup):
+    fcntl = pytest.importorskip("fcntl")
+    # Another worker's regeneration child holding the lock
+    fd = os.open(webapp_app.REGEN_LOCK_PATH, os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        webapp_app._run_regen_optimized("202508")
+        assert startup == []
+        assert not webapp_app._check_ready()
+    finally:
+        os.close(fd)
+    assert webapp_app._check_ready()
+
+
+def _age_marker(out_dir, seconds):
+    write_generated_marker(out_dir.as_posix(), "202508")
+    when = time.time() - seconds
+    os.utime(out_dir / ".generated_202508.json", (when, when))
+
+
+def test_read_only_skips_startup_regen(startup, monkeypatch):
+    monkeypatch.setenv("READ_ONLY", "1")
+    webapp_app._startup_regenerate_async()
+    assert startup == []
+    assert webapp_app._ready is True
+
+
+@pytest.mark.parametrize("max_age", [None, "bad"])
+def test_fresh_marker_skips_startup_regen(startup, tmp_path, monkeypatch, max_age):
+    # An invalid STARTUP_MAX_AGE falls back to the 3600s default
+    if max_age is not None:
+        monkeypatch.setenv("STARTUP_MAX_AGE", max_age)
+    _age_marker(tmp_path, 1800)
+    webapp_app._startup_regenerate_async()
+    assert startup == []
+    assert webapp_app._ready is True
+
+
+def test_stale_marker_starts_startup_regen(startup, tmp_path, monkeypatch):
+    monkeypatch.setenv("STARTUP_MAX_AGE", "600")
+    _age_marker(tmp_path, 1800)
+    webapp_app._startup_regenerate_async()
+    assert len(startup) == 1
+    assert webapp_app._ready is False
+
+
+def test_other_months_relink_rewritten_ytd_plot(client, background, fetches, tmp_path):
+    for name in ("yields_all_202508.png", "yields_facets_202508.png", "yields_ytd_2025.png"):
+        (tmp_path / name).write_bytes(b"png")
+        os.utime(tmp_path / name, (1754000000, 1754000000))
+    write_generated_marker(tmp_path.as_posix(), "202508")
+    before = _img_src(client.get("/?month=202508").data.decode(), "yields_ytd_2025.png")
+    assert webapp_app.cache_key("202508") in webapp_app._cache
+
+    # Generating another month of the same year rewrites the shared YTD plot
+    client.get("/?month=202507")
+    background.run()
+    html = client.get("/?month=202508").data.decode()
+    assert _img_src(html, "yields_ytd_2025.png") != before
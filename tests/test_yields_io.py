@@ -0,0 +1,90 @@
+import os
+
+import pandas as pd
+from treas_analyzer import main
+from treas_analyzer.main import load_yields, save_yields, MATURITY_ORDER
+
+
+def _frame():
+    data = {"Date": pd.date_range("2025-08-01", periods=3, freq="D")}
+    for i, m in enumerate(MATURITY_ORDER):
+        data[m] = [4.0 + i / 100, float("nan"), 4.1234]
+    return pd.DataFrame(data)
+
+
+def test_round_trip_prefers_parquet(tmp_path):
+    csv_path = (tmp_path / "yields_202508.csv").as_posix()
+    save_yields(_frame(), csv_path)
+    assert os.path.exists(csv_path[:-4] + ".parquet")
+
+    df = load_yields(csv_path, columns=["Date", "1M", "30Y"])
+    assert list(df.columns) == ["Date", "1M", "30Y"]
+    assert df["Date"].dtype.kind == "M"
+    assert df["30Y"].tolist()[0] == 4.11
+    assert df["1M"].isna().tolist() == [False, True, False]
+
+
+def test_stale_parquet_falls_back_to_csv(tmp_path):
+    csv_path = (tmp_path / "yields_202508.csv").as_posix()
+    save_yields(_frame(), csv_path)
+    pq_path = csv_path[:-4] + ".parquet"
+    st = os.stat(csv_path)
+    os.utime(pq_path, (st.st_atime, st.st_mtime - 10))
+    # Only the CSV reflects this edit
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("2025-08-04" + ",5.0000" * len(MATURITY_ORDER) + "\n")
+
+    df = load_yields(csv_path)
+    assert len(df) == 4
+    assert df["Date"].dtype.kind == "M"
+    assert df["10Y"].dtype == "float64"
+    assert df["10Y"].iat[-1] == 5.0
+
+
+def _feed(days):
+    entries = "".join(
+        f"""<entry><content type="application/xml"><m:properties>
+        <d:NEW_DATE m:type="Edm.DateTime">{d}T00:00:00</d:NEW_DATE>
+        <d:BC_1MONTH m:type="Edm.Double">4.40</d:BC_1MONTH>
+        </m:properties></content></entry>"""
+        for d in days
+    )
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices"
+      xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"
+      xmlns="http://www.w3.org/2005/Atom">{entries}</feed>"""
+
+
+def test_month_cache_only_trusted_once_month_closed(tmp_path, monkeypatch):
+    days = ["2025-08-01", "2025-08-04"]
+    calls = []
+
+    def fake_fetch(url, verify_ssl=True, session=None):
+        calls.append(url)
+        return _feed(days)
+
+    monkeypatch.setattr(main, "fetch_xml", fake_fetch)
+    cache_dir = tmp_path.as_posix()
+
+    # While 202508 is the current month nothing is cached
+    monkeypatch.setattr(main, "build_month_arg", lambda ym: ym or "202508")
+    assert len(main.fetch_month_df("202508", cache_dir=cache_dir)) == 2
+    assert main._month_cache_files(cache_dir, "202508") == []
+
+    # A partial-month cache left by an older version (written before the month ended)
+    # is ignored once the month closes
+    stale = tmp_path / ".cache_202508_old.parquet"
+    pd.DataFrame({"Date": pd.to_datetime(days[:1])}).to_parquet(stale)
+    os.utime(stale, (1754740800, 1754740800))  # 2025-08-09
+
+    days.append("2025-08-29")
+    monkeypatch.setattr(main, "build_month_arg", lambda ym: ym or "202509")
+    assert len(main.fetch_month_df("202508", cache_dir=cache_dir)) == 3
+    assert len(calls) == 2
+    assert not stale.exists()
+    assert len(main._month_cache_files(cache_dir, "202508")) == 1
+
+    # Now the closed month is served from its cache
+    df = main.fetch_month_df("202508", cache_dir=cache_dir)
+    assert len(calls) == 2
+    assert len(df) == 3
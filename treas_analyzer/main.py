@@ -1,22 +1,42 @@
 import argparse
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
+import io
 import os
+import re
 import sys
-import textwrap
+import threading
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 
 import numpy as np
 import pandas as pd
+import matplotlib
+
+# Plots are rendered to files, so default to the non-interactive Agg backend (no GUI
+# toolkit import on headless hosts). Set MPLBACKEND to use an interactive one with --show.
+if not os.environ.get("MPLBACKEND"):
+    matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
 import json
 from pathlib import Path
 from zoneinfo import ZoneInfo
 import math
 
+try:  # libxml2-backed parser is much faster; the stdlib API is a drop-in fallback
+    from lxml import etree as ET
+    _HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _HAVE_LXML = False
+
 ATOM_NS = {
     "atom": "http://www.w3.org/2005/Atom",
     "m": "http://schemas.microsoft.com/ado/2007/08/dataservices/metadata",
@@ -39,6 +59,20 @@ MATURITY_FIELDS = {
     "BC_30YEAR": ("30Y", 30.0),
 }
 
+# Fully-qualified (Clark notation) tags, resolved once so per-entry lookups skip
+# namespace-prefix expansion.
+ENTRY_TAG = f"{{{ATOM_NS['atom']}}}entry"
+PROPERTIES_PATH = f"{{{ATOM_NS['atom']}}}content/{{{ATOM_NS['m']}}}properties"
+DATE_TAG = f"{{{ATOM_NS['d']}}}NEW_DATE"
+MATURITY_TAGS = [
+    (label, f"{{{ATOM_NS['d']}}}{xml_field}") for xml_field, (label, _years) in MATURITY_FIELDS.items()
+]
+
+MATURITY_YEARS = {label: years for label, years in MATURITY_FIELDS.values()}
+
+# Column dtypes for reading saved yields back, so read_csv skips type inference
+YIELD_DTYPES = {label: "float64" for label, _years in MATURITY_FIELDS.values()}
+
 MATURITY_ORDER = [
     "1M",
     "2M",
@@ -65,6 +99,24 @@ MATURITY_COLORS = {
 }
 
 
+# Figures reused across plot calls (keyed by layout); matplotlib is not thread-safe,
+# so all drawing on them happens under _FIG_LOCK.
+_FIG_CACHE: Dict[Any, Figure] = {}
+_FIG_LOCK = threading.RLock()
+
+# PNG encoding dominates savefig time at this size; light zlib compression is much
+# faster for a modestly larger file.
+SAVEFIG_KWARGS: Dict[str, Any] = {"dpi": 150, "pil_kwargs": {"compress_level": 1}}
+
+# Shared HTTP session so repeated fetches (e.g. the YTD months) reuse pooled connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=12, pool_maxsize=12))
+
+# Upper bound on concurrent monthly fetches when building YTD data: a full year, so
+# every month is in flight at once and YTD wall time is about one round trip
+YTD_FETCH_WORKERS = 12
+
+
 @dataclass
 class Trend:
     slope_per_day: float
@@ -72,15 +124,19 @@ class Trend:
     r2: float
 
 # Helper functions (build_month_arg, build_url, etc.) remain unchanged
+_YEAR_MONTH_RE = re.compile(r"[0-9]{6}")
+
+
 def build_month_arg(year_month: Optional[str]) -> str:
     if year_month:
-        if not (len(year_month) == 6 and year_month.isdigit()):
+        if not _YEAR_MONTH_RE.fullmatch(year_month):
             raise ValueError("--month must be in YYYYMM format")
         return year_month
     today = dt.date.today()
     return f"{today.year}{today.month:02d}"
 
 
+@functools.lru_cache(maxsize=64)
 def build_url(year_month: str) -> str:
     base = (
         "https://home.treasury.gov/resource-center/data-chart-center/interest-rates/pages/xml"
@@ -90,21 +146,24 @@ def build_url(year_month: str) -> str:
     )
 
 
+_ET_TZ = ZoneInfo("America/New_York")
+
+
 def _et_now() -> dt.datetime:
     """Current time in America/New_York (ET)."""
-    return dt.datetime.now(tz=ZoneInfo("America/New_York"))
+    return dt.datetime.now(tz=_ET_TZ)
 
 
+@functools.lru_cache(maxsize=64)
 def _marker_path(out_dir: str, year_month: str) -> Path:
     return Path(out_dir) / f".generated_{year_month}.json"
 
 
-def load_last_generated_ymd(out_dir: str, year_month: str) -> Optional[dt.date]:
-    p = _marker_path(out_dir, year_month)
-    if not p.exists():
-        return None
+@functools.lru_cache(maxsize=8)
+def _read_marker_ymd(path: str, mtime_ns: int) -> Optional[dt.date]:
+    # Keyed on mtime so a rewritten marker (from any process) is re-read
     try:
-        data = json.loads(p.read_text())
+        data = json.loads(Path(path).read_text())
         ymd = data.get("last_generated_ymd")
         if ymd:
             return dt.date.fromisoformat(ymd)
@@ -113,6 +172,23 @@ def load_last_generated_ymd(out_dir: str, year_month: str) -> Optional[dt.date]:
     return None
 
 
+def load_last_generated_ymd(out_dir: str, year_month: str) -> Optional[dt.date]:
+    p = _marker_path(out_dir, year_month)
+    try:
+        mtime_ns = p.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _read_marker_ymd(str(p), mtime_ns)
+
+
+def generated_marker_age(out_dir: str, year_month: str) -> Optional[float]:
+    """Seconds since the month's generated marker was written, or None if there is none."""
+    try:
+        return time.time() - _marker_path(out_dir, year_month).stat().st_mtime
+    except OSError:
+        return None
+
+
 def write_generated_marker(out_dir: str, year_month: str, when_et: Optional[dt.datetime] = None) -> None:
     when = when_et or _et_now()
     payload = {
@@ -123,19 +199,35 @@ def write_generated_marker(out_dir: str, year_month: str, when_et: Optional[dt.d
     p.write_text(json.dumps(payload, indent=2))
 
 
-def should_regenerate(out_dir: str, year_month: str, files_exist: bool) -> bool:
+def list_out_dir(out_dir: str) -> Set[str]:
+    """Names of the entries in ``out_dir`` (one directory read instead of a stat per file)."""
+    try:
+        with os.scandir(out_dir) as it:
+            return {e.name for e in it}
+    except FileNotFoundError:
+        return set()
+
+
+def should_regenerate(
+    out_dir: str, year_month: str, files_exist: bool, existing: Optional[Set[str]] = None
+) -> bool:
     """Return True if we should regenerate network-based outputs now (ET).
 
     - If required files are missing, regenerate.
     - If already generated today, do not regenerate.
     - If not yet generated today and current ET time >= 12:00, regenerate.
     - Otherwise, skip regeneration and use cache.
+
+    ``existing`` (from list_out_dir) lets the marker lookup skip a stat when it is absent.
     """
     if not files_exist:
         return True
     now = _et_now()
     today = now.date()
-    last = load_last_generated_ymd(out_dir, year_month)
+    if existing is not None and _marker_path(out_dir, year_month).name not in existing:
+        last = None
+    else:
+        last = load_last_generated_ymd(out_dir, year_month)
     if last == today:
         return False
     if now.time() >= dt.time(hour=12, minute=0):
@@ -143,56 +235,98 @@ def should_regenerate(out_dir: str, year_month: str, files_exist: bool) -> bool:
     return False
 
 
-def fetch_xml(url: str, timeout: int = 30, verify_ssl: bool = True) -> str:
+def fetch_xml(url: str, timeout: int = 30, verify_ssl: bool = True, session: Optional[requests.Session] = None) -> str:
     headers = {
         "User-Agent": "treas-analyzer/1.0 (+https://github.com/) Python-requests",
         "Accept": "application/xml, text/xml;q=0.9, */*;q=0.8",
+        # The XML is highly repetitive; requests transparently decodes compressed bodies
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
     }
-    resp = requests.get(url, timeout=timeout, headers=headers, verify=verify_ssl)
+    resp = (session or _SESSION).get(url, timeout=timeout, headers=headers, verify=verify_ssl)
     resp.raise_for_status()
     return resp.text
 
 
-def parse_feed(xml_text: str) -> pd.DataFrame:
-    root = ET.fromstring(xml_text)
-    rows: List[Dict[str, Any]] = []
+def _parse_entry(entry: Any) -> Optional[Tuple[dt.date, List[Optional[float]]]]:
+    """Return (date, yields in MATURITY_TAGS order) for one feed entry, or None."""
+    props = entry.find(PROPERTIES_PATH)
+    if props is None:
+        return None
 
-    for entry in root.findall("atom:entry", ATOM_NS):
-        props = entry.find("atom:content/m:properties", ATOM_NS)
-        if props is None:
-            continue
-        row: Dict[str, Any] = {}
+    date_str = props.findtext(DATE_TAG, default="").strip()
+    if not date_str:
+        return None
+    try:
+        date = dt.datetime.fromisoformat(date_str).date()
+    except Exception:
+        date = dt.date.fromisoformat(date_str[:10])
 
-        date_el = props.find("d:NEW_DATE", ATOM_NS)
-        if date_el is None or date_el.text is None:
-            continue
-        date_str = date_el.text.strip()
-        try:
-            date = dt.datetime.fromisoformat(date_str).date()
-        except Exception:
-            date = dt.date.fromisoformat(date_str[:10])
-        row["Date"] = date
+    values: List[Optional[float]] = []
+    for _label, tag in MATURITY_TAGS:
+        txt = props.findtext(tag, default="")
+        val: Optional[float] = None
+        if txt.strip():
+            try:
+                val = float(txt)
+            except ValueError:
+                val = None
+        values.append(val)
+    return date, values
 
-        for xml_field, (label, _years) in MATURITY_FIELDS.items():
-            el = props.find(f"d:{xml_field}", ATOM_NS)
-            val: Optional[float] = None
-            if el is not None and el.text is not None and el.text.strip() != "":
-                try:
-                    val = float(el.text)
-                except ValueError:
-                    val = None
-            row[label] = val
 
-        rows.append(row)
+def parse_feed(xml_text: str) -> pd.DataFrame:
+    # Stream the feed instead of building the whole DOM: each entry is handled as its
+    # end tag arrives, then cleared. Only end events are reported; lxml also filters
+    # them to entries in C and lets the processed siblings be dropped via the parent.
+    source = io.BytesIO(xml_text.encode("utf-8"))
+    if _HAVE_LXML:
+        context = ET.iterparse(source, events=("end",), tag=ENTRY_TAG)
+    else:
+        context = ET.iterparse(source, events=("end",))
+    # Accumulate column-wise so the frame is built from typed columns, not row dicts
+    dates: List[dt.date] = []
+    cols: Dict[str, List[Optional[float]]] = {label: [] for label, _tag in MATURITY_TAGS}
+    col_lists = list(cols.values())
+
+    for _event, elem in context:
+        if elem.tag != ENTRY_TAG:
+            continue
+        parsed = _parse_entry(elem)
+        elem.clear()
+        if _HAVE_LXML:
+            # The stdlib tree has no parent links; there each cleared entry stays behind
+            # as an empty element until parsing ends (a month has ~23 of them)
+            parent = elem.getparent()
+            while elem.getprevious() is not None:
+                del parent[0]
+        if parsed is None:
+            continue
+        date, values = parsed
+        dates.append(date)
+        for col, val in zip(col_lists, values):
+            col.append(val)
 
-    if not rows:
+    if not dates:
         raise RuntimeError("No entries parsed from XML feed; structure may have changed.")
 
-    df = pd.DataFrame(rows)
-    df = df.sort_values("Date").reset_index(drop=True)
+    df = pd.DataFrame({"Date": pd.to_datetime(dates), **cols})
+    df = df.astype({label: "float64" for label in cols})
+    # The feed is normally chronological already; only sort when it is not
+    if any(a > b for a, b in zip(dates, dates[1:])):
+        df = df.sort_values("Date").reset_index(drop=True)
     return df
 
 
+def _day_numbers(dates: pd.Series) -> np.ndarray:
+    """Days since the Unix epoch as float64, usable as regression x-values.
+
+    Works for both datetime.date objects and datetime64 columns without a per-row
+    Python callback. The offset from date.toordinal() cancels out of the slope.
+    """
+    return dates.to_numpy().astype("datetime64[D]").astype(np.int64).astype(np.float64)
+
+
 def compute_trend(dates: pd.Series, values: pd.Series) -> Optional[Trend]:
     mask = values.notna()
     x_dates = dates[mask]
@@ -200,40 +334,86 @@ def compute_trend(dates: pd.Series, values: pd.Series) -> Optional[Trend]:
     if len(y) < 3:
         return None
 
-    x = x_dates.map(lambda d: d.toordinal()).astype(float).to_numpy()
+    x = _day_numbers(x_dates)
     y_np = y.to_numpy()
 
-    slope, intercept = np.polyfit(x, y_np, 1)
+    # Closed-form degree-1 least squares (np.polyfit would go through an SVD)
+    xm = x.mean()
+    ym = y_np.mean()
+    dx = x - xm
+    dy = y_np - ym
+    slope = (dx * dy).sum() / (dx * dx).sum()
+    intercept = ym - slope * xm
     y_pred = slope * x + intercept
 
     ss_res = float(np.sum((y_np - y_pred) ** 2))
-    ss_tot = float(np.sum((y_np - np.mean(y_np)) ** 2))
+    ss_tot = float(np.sum(dy ** 2))
     r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
 
     slope_per_day = float(slope)
     slope_bps_per_month = slope_per_day * 30.0 * 100.0
     return Trend(slope_per_day=slope_per_day, slope_bps_per_month=slope_bps_per_month, r2=r2)
 
+def compute_trends(x: np.ndarray, Y: np.ndarray) -> List[Optional[Trend]]:
+    """Linear trend for every column of ``Y`` (N x M) against ``x`` (N,) in one pass.
+
+    NaNs are excluded per column. Equivalent to calling compute_trend on each column;
+    columns with fewer than 3 observations get None.
+    """
+    mask = ~np.isnan(Y)
+    n = mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xm = np.where(mask, x[:, None], 0.0).sum(axis=0) / n
+        ym = np.nansum(Y, axis=0) / n
+        dx = np.where(mask, x[:, None] - xm, 0.0)
+        dy = np.where(mask, Y - ym, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        slope = sxy / sxx
+        # R² = 1 - SS_res/SS_tot, with SS_res = syy - slope * sxy for a least-squares line
+        r2 = np.where(syy > 0, 1.0 - (syy - slope * sxy) / syy, 0.0)
+
+    trends: List[Optional[Trend]] = []
+    for j in range(Y.shape[1]):
+        if n[j] < 3:
+            trends.append(None)
+            continue
+        slope_per_day = float(slope[j])
+        trends.append(
+            Trend(
+                slope_per_day=slope_per_day,
+                slope_bps_per_month=slope_per_day * 30.0 * 100.0,
+                r2=float(r2[j]),
+            )
+        )
+    return trends
+
 def summarize(df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
-    latest_row = df.iloc[-1]
-    latest_date = latest_row["Date"]
+    latest_date = df["Date"].iat[-1]
+
+    # Only maturities with a known term can be scored
+    labels = [label for label in MATURITY_ORDER if label in df.columns and label in MATURITY_YEARS]
+    Y = df[labels].to_numpy(dtype=np.float64)
+    x = _day_numbers(df["Date"])
+    trends = compute_trends(x, Y)
+
+    # Latest non-NaN yield per maturity, found in one pass over the N x M block
+    valid = ~np.isnan(Y)
+    has_data = valid.any(axis=0)
+    last_valid = np.where(valid, np.arange(Y.shape[0])[:, None], -1).max(axis=0)
+    current_arr = Y[last_valid, np.arange(Y.shape[1])]
+    years_arr = np.array([MATURITY_YEARS[label] for label in labels], dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        intensity_arr = np.where(years_arr > 0, current_arr / np.sqrt(years_arr), np.nan)
 
     metrics = []
-    for label in MATURITY_ORDER:
-        if label not in df.columns:
-            continue
-        series = df[label]
-        if series.notna().sum() == 0:
-            continue
-        current = float(series.dropna().iloc[-1])
-        tr = compute_trend(df["Date"], series)
-        years = next((yrs for k, (lab, yrs) in MATURITY_FIELDS.items() if lab == label), None)
-        if years is None:
-            continue
-        if years > 0:
-            intensity = current / (years ** 0.5)
-        else:
-            intensity = np.nan
+    for j in np.flatnonzero(has_data):
+        label = labels[j]
+        years = MATURITY_YEARS[label]
+        current = float(current_arr[j])
+        intensity = float(intensity_arr[j])
+        tr = trends[j]
 
         trend_effect = 0.0
         if tr is not None:
@@ -267,7 +447,8 @@ def summarize(df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
     mdf["CompositeRank"] = mdf[["RankYield", "RankIntensity", "RankValue"]].mean(axis=1)
 
     best_row = mdf.sort_values(["CompositeRank", "Maturity"]).iloc[0]
-    best_intensity_row = mdf.sort_values('IntensityPctPerYear', ascending=False).iloc[0]
+    # Single-column maxima via idxmax; each pick used to be its own full sort
+    best_intensity_row = mdf.loc[mdf['IntensityPctPerYear'].idxmax()]
     bi_maturity = best_intensity_row['Maturity']
     bi_yield = best_intensity_row['CurrentYieldPct']
     bi_years = best_intensity_row['Years']
@@ -280,9 +461,9 @@ def summarize(df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
     lines = [
         f"Summary for {latest_date:%Y-%m} (latest data {latest_date:%Y-%m-%d})",
         "",
-        f"Highest current yield: {mdf.sort_values('CurrentYieldPct', ascending=False).iloc[0]['Maturity']} (@ {fmt(mdf['CurrentYieldPct'].max())}%)",
-        f"Best duration-adjusted yield (yield / sqrt(years)): {mdf.sort_values('IntensityPctPerYear', ascending=False).iloc[0]['Maturity']} (@ {fmt(mdf['IntensityPctPerYear'].max())} adj units)",
-        f"Best trend-adjusted yield: {mdf.sort_values('ValueScore', ascending=False).iloc[0]['Maturity']} (@ {fmt(mdf['ValueScore'].max())}%)",
+        f"Highest current yield: {mdf.loc[mdf['CurrentYieldPct'].idxmax(), 'Maturity']} (@ {fmt(mdf['CurrentYieldPct'].max())}%)",
+        f"Best duration-adjusted yield (yield / sqrt(years)): {bi_maturity} (@ {fmt(mdf['IntensityPctPerYear'].max())} adj units)",
+        f"Best trend-adjusted yield: {mdf.loc[mdf['ValueScore'].idxmax(), 'Maturity']} (@ {fmt(mdf['ValueScore'].max())}%)",
         f"Best overall (composite): {best_row['Maturity']}",
         "",
         "Notes: Intensity now = yield / sqrt(years); avoids unrealistic inflation of very short maturities.",
@@ -311,47 +492,100 @@ def summarize(df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
     summary_text = "\n".join(lines)
     return mdf, summary_text
 
+def _parquet_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+def save_yields(df: pd.DataFrame, csv_path: str) -> None:
+    """Write the yields CSV plus a Parquet copy next to it for fast, typed reloads.
+
+    The CSV is written first so a Parquet file at least as new as the CSV is always
+    current (see load_yields). Parquet is best-effort; the CSV remains the export.
+    """
+    df.to_csv(csv_path, index=False, float_format="%.4f", lineterminator="\n")
+    try:
+        df.to_parquet(_parquet_path(csv_path), index=False, engine="pyarrow", compression="zstd")
+    except Exception:
+        pass
+
+def load_yields(csv_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load yields saved by save_yields, preferring the Parquet copy when it is current.
+
+    ``columns`` restricts the read to those columns (must include "Date"). Only the
+    CSV fallback tolerates names missing from the file.
+    """
+    pq_path = _parquet_path(csv_path)
+    try:
+        if os.stat(pq_path).st_mtime >= os.stat(csv_path).st_mtime:
+            return pd.read_parquet(pq_path, engine="pyarrow", columns=columns, memory_map=True)
+    except Exception:
+        pass
+    usecols = None if columns is None else (lambda c: c in columns)
+    return pd.read_csv(
+        csv_path, usecols=usecols, dtype=YIELD_DTYPES, parse_dates=["Date"], date_format="%Y-%m-%d"
+    )
+
+def _reuse_figure(key: Any, figsize: Tuple[float, float]) -> Figure:
+    """Return a cleared, cached Figure for ``key`` (created on first use).
+
+    Figures are built with the OO API rather than pyplot so they are not tracked as
+    open pyplot windows and can be kept for the life of the process. Callers must
+    hold _FIG_LOCK while drawing.
+    """
+    fig = _FIG_CACHE.get(key)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        _FIG_CACHE[key] = fig
+    else:
+        fig.clear()
+        fig.set_size_inches(figsize)
+    return fig
+
+def _show_image(path: str) -> None:
+    img = plt.imread(path)  # just to keep consistent; skip heavy show logic
+    plt.imshow(img)
+    plt.axis('off')
+    plt.show()
+
 def plot_facets(df: pd.DataFrame, out_dir: str, year_month: str) -> str:
     """Create per-maturity small multiple facet plot and return path."""
     os.makedirs(out_dir, exist_ok=True)
     cols = 4
     maturities = [m for m in MATURITY_ORDER if m in df.columns and df[m].notna().any()]
     rows = int(np.ceil(len(maturities) / cols)) or 1
-    fig, axes = plt.subplots(rows, cols, figsize=(cols * 3.0, rows * 2.4), sharex=True)
-    if not isinstance(axes, np.ndarray):
-        axes = np.array([[axes]])
-    axes = axes.reshape(rows, cols)
-
-    for idx, m in enumerate(maturities):
-        r = idx // cols
-        c = idx % cols
-        ax = axes[r, c]
-        color = MATURITY_COLORS.get(m)
-        ax.plot(df["Date"], df[m], color=color, linewidth=1.2)
-        ax.set_title(m)
-        ax.grid(True, alpha=0.3)
-        ax.xaxis.set_major_locator(mdates.AutoDateLocator(minticks=3, maxticks=6))
-        ax.xaxis.set_major_formatter(mdates.DateFormatter("%m-%d"))
-
-    # Remove unused axes
-    for j in range(len(maturities), rows * cols):
-        r = j // cols
-        c = j % cols
-        fig.delaxes(axes[r, c])
-
-    # Hide x tick labels on non-last rows
-    for r in range(rows - 1):
-        for c in range(cols):
-            try:
-                axes[r, c].tick_params(labelbottom=False)
-            except Exception:
-                pass
-
-    fig.suptitle(f"Treasury Yields by Maturity ({year_month})")
-    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
-    p = os.path.join(out_dir, f"yields_facets_{year_month}.png")
-    fig.savefig(p, dpi=150)
-    plt.close(fig)
+    dates_np = df["Date"].to_numpy()
+    with _FIG_LOCK:
+        fig = _reuse_figure(("facets", rows, cols), (cols * 3.0, rows * 2.4))
+        axes = fig.subplots(rows, cols, sharex=True, squeeze=False)
+
+        for idx, m in enumerate(maturities):
+            r = idx // cols
+            c = idx % cols
+            ax = axes[r, c]
+            color = MATURITY_COLORS.get(m)
+            ax.plot(dates_np, df[m].to_numpy(), color=color, linewidth=1.2)
+            ax.set_title(m)
+            ax.grid(True, alpha=0.3)
+            ax.xaxis.set_major_locator(mdates.AutoDateLocator(minticks=3, maxticks=6))
+            ax.xaxis.set_major_formatter(mdates.DateFormatter("%m-%d"))
+
+        # Remove unused axes
+        for j in range(len(maturities), rows * cols):
+            r = j // cols
+            c = j % cols
+            fig.delaxes(axes[r, c])
+
+        # Hide x tick labels on non-last rows
+        for r in range(rows - 1):
+            for c in range(cols):
+                try:
+                    axes[r, c].tick_params(labelbottom=False)
+                except Exception:
+                    pass
+
+        fig.suptitle(f"Treasury Yields by Maturity ({year_month})")
+        fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+        p = os.path.join(out_dir, f"yields_facets_{year_month}.png")
+        fig.savefig(p, **SAVEFIG_KWARGS)
     return p
 
 def plot_all(df: pd.DataFrame, out_dir: str, year_month: str, show: bool = False) -> List[str]:
@@ -359,21 +593,23 @@ def plot_all(df: pd.DataFrame, out_dir: str, year_month: str, show: bool = False
     pngs: List[str] = []
 
     # Combined plot
-    fig, ax = plt.subplots(figsize=(10, 6))
-    for label in MATURITY_ORDER:
-        if label in df.columns and df[label].notna().any():
-            color = MATURITY_COLORS.get(label)
-            ax.plot(df["Date"], df[label], label=label, color=color, linewidth=1.2)
-    ax.set_title(f"Treasury Yields ({year_month})")
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Yield (%)")
-    ax.legend(ncol=4, fontsize=8)
-    ax.grid(True, alpha=0.3)
-    p1 = os.path.join(out_dir, f"yields_all_{year_month}.png")
-    fig.tight_layout()
-    fig.savefig(p1, dpi=150)
+    dates_np = df["Date"].to_numpy()
+    with _FIG_LOCK:
+        fig = _reuse_figure("combined", (10, 6))
+        ax = fig.add_subplot(111)
+        for label in MATURITY_ORDER:
+            if label in df.columns and df[label].notna().any():
+                color = MATURITY_COLORS.get(label)
+                ax.plot(dates_np, df[label].to_numpy(), label=label, color=color, linewidth=1.2)
+        ax.set_title(f"Treasury Yields ({year_month})")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Yield (%)")
+        ax.legend(ncol=4, fontsize=8)
+        ax.grid(True, alpha=0.3)
+        p1 = os.path.join(out_dir, f"yields_all_{year_month}.png")
+        fig.tight_layout()
+        fig.savefig(p1, **SAVEFIG_KWARGS)
     pngs.append(p1)
-    plt.close(fig)
 
     # Facets
     p2 = plot_facets(df, out_dir, year_month)
@@ -381,73 +617,126 @@ def plot_all(df: pd.DataFrame, out_dir: str, year_month: str, show: bool = False
 
     if show:
         # Optionally display last figure (facets) if interactive
-        img = plt.imread(p2)  # just to keep consistent; skip heavy show logic
-        plt.imshow(img)
-        plt.axis('off')
-        plt.show()
-    else:
-        plt.close('all')
+        _show_image(p2)
     return pngs
 
-def _months_ytd(year_month: str) -> List[str]:
+@functools.lru_cache(maxsize=64)
+def _months_ytd(year_month: str) -> Tuple[str, ...]:
     year = int(year_month[:4])
     month = int(year_month[4:])
-    return [f"{year}{m:02d}" for m in range(1, month + 1)]
+    return tuple(f"{year}{m:02d}" for m in range(1, month + 1))
+
+def _month_cache_files(cache_dir: str, year_month: str) -> List[Path]:
+    return sorted(Path(cache_dir).glob(f".cache_{year_month}_*.parquet"))
+
+def _month_end_ts(year_month: str) -> float:
+    """Local timestamp of midnight on the first day after ``year_month``."""
+    y, m = int(year_month[:4]), int(year_month[4:])
+    nxt = dt.datetime(y + m // 12, m % 12 + 1, 1)
+    return nxt.timestamp()
+
+def fetch_month_df(
+    year_month: str,
+    verify_ssl: bool = True,
+    cache_dir: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> pd.DataFrame:
+    """Fetch and parse one month of yields.
+
+    With ``cache_dir``, each closed (past) month is stored as
+    ``.cache_{ym}_{hash}.parquet`` (hash of the XML body). Closed months never change,
+    so for those an existing cache file is read instead of hitting the network. The
+    current month is never cached, and a file written before its month ended (a
+    partial month) is ignored and replaced.
+    """
+    closed = year_month < build_month_arg(None)
+    if cache_dir and closed:
+        month_end = _month_end_ts(year_month)
+        for p in _month_cache_files(cache_dir, year_month):
+            try:
+                if p.stat().st_mtime < month_end:
+                    continue
+                return pd.read_parquet(p)
+            except Exception:
+                continue
 
-def fetch_month_df(year_month: str, verify_ssl: bool = True) -> pd.DataFrame:
     url = build_url(year_month)
-    xml_text = fetch_xml(url, verify_ssl=verify_ssl)
-    return parse_feed(xml_text)
+    xml_text = fetch_xml(url, verify_ssl=verify_ssl, session=session)
+    df = parse_feed(xml_text)
 
-def build_ytd_df(year_month: str, verify_ssl: bool = True) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
-    for ym in _months_ytd(year_month):
+    if cache_dir and closed:
+        h = hashlib.sha256(xml_text.encode("utf-8")).hexdigest()[:16]
+        p = Path(cache_dir) / f".cache_{year_month}_{h}.parquet"
         try:
-            frames.append(fetch_month_df(ym, verify_ssl=verify_ssl))
+            # Rewrite rather than skip an existing (possibly pre-month-end) file
+            df.to_parquet(p, index=False)
+            # Drop caches of earlier revisions of this month's feed
+            for old in _month_cache_files(cache_dir, year_month):
+                if old != p:
+                    old.unlink(missing_ok=True)
         except Exception:
-            continue
+            pass
+    return df
+
+def build_ytd_df(
+    year_month: str,
+    verify_ssl: bool = True,
+    cache_dir: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> pd.DataFrame:
+    def _fetch(ym: str) -> Optional[pd.DataFrame]:
+        try:
+            return fetch_month_df(ym, verify_ssl=verify_ssl, cache_dir=cache_dir, session=session)
+        except Exception:
+            return None
+
+    # Months are independent network fetches; run them concurrently (order is preserved)
+    months = _months_ytd(year_month)
+    with ThreadPoolExecutor(max_workers=min(YTD_FETCH_WORKERS, len(months))) as pool:
+        frames = [f for f in pool.map(_fetch, months) if f is not None]
     if not frames:
         raise RuntimeError("No data available for YTD plot")
+    # Each month frame is date-sorted and months are in order, so the concat is too
     df = pd.concat(frames, ignore_index=True)
-    df = df.sort_values("Date").reset_index(drop=True)
     return df
 
 def plot_ytd(df: pd.DataFrame, out_dir: str, year_month: str, show: bool = False) -> str:
     year = year_month[:4]
     os.makedirs(out_dir, exist_ok=True)
 
-    plt.figure(figsize=(10, 6))
-    for label in MATURITY_ORDER:
-        if label in df.columns and df[label].notna().any():
-            color = MATURITY_COLORS.get(label)
-            plt.plot(df["Date"], df[label], label=label, linewidth=1.2, color=color)
-    plt.title(f"Treasury Yields YTD ({year})")
-    plt.xlabel("Date")
-    plt.ylabel("Yield (%)")
-    plt.legend(ncol=4, fontsize=8)
-    plt.grid(True, alpha=0.3)
-    plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter("%b"))
-    p = os.path.join(out_dir, f"yields_ytd_{year}.png")
-    plt.tight_layout()
-    plt.savefig(p, dpi=150)
+    dates_np = df["Date"].to_numpy()
+    with _FIG_LOCK:
+        fig = _reuse_figure("ytd", (10, 6))
+        ax = fig.add_subplot(111)
+        for label in MATURITY_ORDER:
+            if label in df.columns and df[label].notna().any():
+                color = MATURITY_COLORS.get(label)
+                ax.plot(dates_np, df[label].to_numpy(), label=label, linewidth=1.2, color=color)
+        ax.set_title(f"Treasury Yields YTD ({year})")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Yield (%)")
+        ax.legend(ncol=4, fontsize=8)
+        ax.grid(True, alpha=0.3)
+        ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter("%b"))
+        p = os.path.join(out_dir, f"yields_ytd_{year}.png")
+        fig.tight_layout()
+        fig.savefig(p, **SAVEFIG_KWARGS)
     if show:
-        plt.show()
-    else:
-        plt.close("all")
+        _show_image(p)
     return p
 
 # New function to encapsulate core logic
-def process_and_summarize_data(year_month: str, insecure: bool) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def process_and_summarize_data(year_month: str, insecure: bool) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
     """
     Fetches, processes, and summarizes Treasury yield data.
-    Returns the raw data and the summary metrics.
+    Returns the raw data, the summary metrics and the summary text.
     """
     url = build_url(year_month)
     xml_text = fetch_xml(url, verify_ssl=not insecure)
     df = parse_feed(xml_text)
-    metrics_df, _ = summarize(df)
-    return df, metrics_df
+    metrics_df, summary_text = summarize(df)
+    return df, metrics_df, summary_text
 
 def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(
@@ -489,20 +778,22 @@ def main(argv: Optional[List[str]] = None) -> int:
     p_all = os.path.join(out_dir, f"yields_all_{year_month}.png")
     p_ytd = os.path.join(out_dir, f"yields_ytd_{year_month[:4]}.png")
     p_facets = os.path.join(out_dir, f"yields_facets_{year_month}.png")
-    files_exist = all(os.path.exists(p) for p in [csv_path, p_all, p_ytd, p_facets])
-    regen_needed = args.force_regenerate or should_regenerate(out_dir, year_month, files_exist)
+    existing = list_out_dir(out_dir)
+    files_exist = all(os.path.basename(p) in existing for p in [csv_path, p_all, p_ytd, p_facets])
+    regen_needed = args.force_regenerate or should_regenerate(out_dir, year_month, files_exist, existing)
 
     df = None
     metrics_df = None
+    summary = ""
     regen_status = "Using cached outputs"
 
     if regen_needed:
         try:
-            df, metrics_df = process_and_summarize_data(year_month, args.insecure)
-            df.to_csv(csv_path, index=False)
+            df, metrics_df, summary = process_and_summarize_data(year_month, args.insecure)
+            save_yields(df, csv_path)
             plot_all(df, out_dir, year_month, show=args.show)
             try:
-                df_ytd = build_ytd_df(year_month, verify_ssl=not args.insecure)
+                df_ytd = build_ytd_df(year_month, verify_ssl=not args.insecure, cache_dir=out_dir)
                 plot_ytd(df_ytd, out_dir, year_month, show=False)
             except Exception as e:
                 print(f"Warning: could not build YTD plot: {e}", file=sys.stderr)
@@ -511,21 +802,21 @@ def main(argv: Optional[List[str]] = None) -> int:
         except Exception as e:
             print(f"Error obtaining fresh data: {e}", file=sys.stderr)
             if os.path.exists(csv_path):
-                df = pd.read_csv(csv_path, parse_dates=["Date"]).assign(Date=lambda s: s["Date"].dt.date)
-                metrics_df, _ = summarize(df)
+                df = load_yields(csv_path)
+                metrics_df, summary = summarize(df)
             else:
                 return 2
     else:
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path, parse_dates=["Date"]).assign(Date=lambda s: s["Date"].dt.date)
-            metrics_df, _ = summarize(df)
+        if os.path.basename(csv_path) in existing:
+            df = load_yields(csv_path)
+            metrics_df, summary = summarize(df)
         else:
             try:
-                df, metrics_df = process_and_summarize_data(year_month, args.insecure)
-                df.to_csv(csv_path, index=False)
+                df, metrics_df, summary = process_and_summarize_data(year_month, args.insecure)
+                save_yields(df, csv_path)
                 plot_all(df, out_dir, year_month, show=args.show)
                 try:
-                    df_ytd = build_ytd_df(year_month, verify_ssl=not args.insecure)
+                    df_ytd = build_ytd_df(year_month, verify_ssl=not args.insecure, cache_dir=out_dir)
                     plot_ytd(df_ytd, out_dir, year_month, show=False)
                 except Exception as e:
                     print(f"Warning: could not build YTD plot: {e}", file=sys.stderr)
@@ -535,28 +826,23 @@ def main(argv: Optional[List[str]] = None) -> int:
                 print(f"Error obtaining data: {e}", file=sys.stderr)
                 return 2
 
-    _, summary = summarize(df)
     summary_path = os.path.join(out_dir, f"summary_{year_month}.txt")
     with open(summary_path, "w", encoding="utf-8") as f:
         f.write(summary)
         f.write("\n\n")
         f.write("Top 5 by Composite Rank:\n")
-        top5 = metrics_df.sort_values(["CompositeRank"]).head(5)
+        top5 = metrics_df.nsmallest(5, "CompositeRank")
         for _, r in top5.iterrows():
             f.write(
                 f"  {r['Maturity']}: yield {r['CurrentYieldPct']:.2f}% | trend {r['TrendBpsPerMonth'] if not np.isnan(r['TrendBpsPerMonth']) else 'n/a'} bps/mo | composite rank {r['CompositeRank']:.1f}\n"
             )
 
     print(
-        textwrap.dedent(
-            f"""
-            {regen_status} for {year_month}.
-            Rows: {len(df)} | CSV: {csv_path}
-            Summary:
-            {summary}
-            Full summary saved to: {summary_path}
-            """
-        ).strip()
+        f"{regen_status} for {year_month}.\n"
+        f"Rows: {len(df)} | CSV: {csv_path}\n"
+        f"Summary:\n"
+        f"{summary}\n"
+        f"Full summary saved to: {summary_path}"
     )
 
     return 0
@@ -1,14 +1,32 @@
-from flask import Flask, render_template, request, send_from_directory, jsonify, g
+from flask import Flask, Response, render_template, request, send_from_directory, g
 import os
+import re
+import subprocess
 import sys
 import threading
 import time
-import datetime as dt
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 import pandas as pd
-import asyncio
 from concurrent.futures import ThreadPoolExecutor
-import functools
+try:
+    import orjson
+
+    def _json_bytes(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # stdlib fallback, same compact output
+    import json
+
+    def _json_bytes(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, startup regeneration is not deduplicated
+    fcntl = None
+from collections import OrderedDict
+from cachetools import TTLCache
+from typing import Callable, Dict, Optional, Set, Tuple
 
 from treas_analyzer.main import (
     build_month_arg,
@@ -19,18 +37,229 @@ from treas_analyzer.main import (
     plot_ytd,
     build_ytd_df,
     summarize,
+    save_yields,
+    load_yields,
     should_regenerate,
+    list_out_dir,
     write_generated_marker,
+    generated_marker_age,
     MATURITY_FIELDS,
     MATURITY_ORDER,
+    MATURITY_YEARS,
 )
 
-app = Flask(__name__)
+# Position of each maturity label in display order
+_MATURITY_ORDER_INDEX = {m: i for i, m in enumerate(MATURITY_ORDER)}
+
+# /invest table rows in display order, with each maturity's term in years
+_INVEST_LABELS = sorted((label for label, _ in MATURITY_FIELDS.values()), key=_MATURITY_ORDER_INDEX.__getitem__)
+_INVEST_YEARS = np.array([MATURITY_YEARS[label] for label in _INVEST_LABELS], dtype=np.float64)
 
-# Global cache and state for Cloud Run optimization
-_cache = {}
+# /ladder candidate rungs as (label, years), in feed order; maturities without a term are skipped
+_LADDER_ROWS = tuple((label, years) for label, years in MATURITY_FIELDS.values() if years is not None)
+
+app = Flask(__name__)
+# Templates are loaded once below; don't stat them for changes on every render
+app.config["TEMPLATES_AUTO_RELOAD"] = False
+# Size the compiled-template cache explicitly; must be set before jinja_env is first created
+app.jinja_options = {**app.jinja_options, "cache_size": 50}
+
+# Generated artifacts (CSV/Parquet/PNGs); shared with the CLI's default --out
+OUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out"))
+os.makedirs(OUT_DIR, exist_ok=True)
+
+# Held (via flock) by the startup regeneration subprocess so only one worker starts it
+REGEN_LOCK_PATH = os.path.join(OUT_DIR, ".regen.lock")
+
+# Global cache and state for Cloud Run optimization. _cache holds index()'s rendered page
+# per month as (csv mtime, HTML bytes) for 30 minutes; a rewritten CSV invalidates it.
+# TTLCache isn't thread-safe, so access goes through _cache_lock.
+_cache: "TTLCache[str, Tuple[float, bytes]]" = TTLCache(maxsize=10, ttl=1800)
+_cache_lock = threading.RLock()
 _ready = False
-_executor = ThreadPoolExecutor(max_workers=2)
+_regen_proc: Optional[subprocess.Popen] = None
+# pid of the process that spawned _regen_proc; gunicorn --preload forks workers after it
+_regen_owner_pid = 0
+# Set when another worker already held the regeneration lock at startup
+_regen_elsewhere = False
+_executor = ThreadPoolExecutor(max_workers=4)
+
+# Connection pool shared by every request thread (the month fetch and the YTD fetches
+# running next to it), so Treasury TLS connections are reused across requests
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Only Date and the maturity columns are read back from cached yields files
+_YIELD_COLUMNS = ["Date"] + [label for _, (label, _) in MATURITY_FIELDS.items()]
+
+# Parsed yields CSVs plus their summarize() output and latest yields, keyed by
+# (path, mtime) so a rewritten file is picked up automatically. Bounded LRU; shared
+# across request threads.
+_DfEntry = Tuple[pd.DataFrame, Optional[pd.DataFrame], Optional[str], pd.Series]
+_DF_CACHE: "OrderedDict[Tuple[str, float], _DfEntry]" = OrderedDict()
+_DF_CACHE_LOCK = threading.Lock()
+_DF_CACHE_SIZE = 8
+
+# One lock per year_month guarding the fetch/plot regeneration in index()
+_REGEN_LOCKS: Dict[str, threading.Lock] = {}
+_REGEN_LOCKS_GUARD = threading.Lock()
+
+def _regen_lock(year_month: str) -> threading.Lock:
+    with _REGEN_LOCKS_GUARD:
+        return _REGEN_LOCKS.setdefault(year_month, threading.Lock())
+
+# Years whose missing YTD plot has already been attempted by this process
+_YTD_ATTEMPTED: Set[str] = set()
+_YTD_ATTEMPTED_LOCK = threading.Lock()
+
+def _claim_ytd(year: str) -> bool:
+    with _YTD_ATTEMPTED_LOCK:
+        if year in _YTD_ATTEMPTED:
+            return False
+        _YTD_ATTEMPTED.add(year)
+        return True
+
+# Months being refreshed and/or plotted (including a missing YTD plot) in the
+# background; requests meanwhile serve the month's existing CSV
+_REGEN_IN_FLIGHT: Set[str] = set()
+_REGEN_IN_FLIGHT_LOCK = threading.Lock()
+
+def _regen_pending(year_month: str) -> bool:
+    with _REGEN_IN_FLIGHT_LOCK:
+        return year_month in _REGEN_IN_FLIGHT
+
+def _claim_regen(year_month: str) -> bool:
+    with _REGEN_IN_FLIGHT_LOCK:
+        if year_month in _REGEN_IN_FLIGHT:
+            return False
+        _REGEN_IN_FLIGHT.add(year_month)
+        return True
+
+def _release_regen(year_month: str) -> None:
+    with _REGEN_IN_FLIGHT_LOCK:
+        _REGEN_IN_FLIGHT.discard(year_month)
+
+def _drop_cached_pages(year: str) -> None:
+    """Forget rendered pages of ``year``'s months; they all link its shared YTD plot."""
+    prefix = cache_key(year)
+    with _cache_lock:
+        for k in [k for k in _cache.keys() if k.startswith(prefix)]:
+            _cache.pop(k, None)
+
+def _plot_month(df: pd.DataFrame, year_month: str, out_dir: str, get_ytd: Callable[[], pd.DataFrame]) -> None:
+    """Render a freshly fetched month's plots, then mark the month generated."""
+    try:
+        plot_all(df, out_dir, year_month, show=False)
+        # Attempt to also build YTD plot (non-fatal if it fails)
+        try:
+            plot_ytd(get_ytd(), out_dir, year_month, show=False)
+        except Exception:
+            pass
+        write_generated_marker(out_dir, year_month)
+    except Exception as e:
+        print(f"[plots] Plotting failed for {year_month}: {e}", file=sys.stderr)
+    finally:
+        # Other months' cached pages still link the previous YTD image version
+        _drop_cached_pages(year_month[:4])
+        _release_regen(year_month)
+
+def _refresh_month(year_month: str, insecure: bool, out_dir: str) -> None:
+    """Stale-while-revalidate: refetch a month whose cached outputs are out of date."""
+    try:
+        with _regen_lock(year_month):
+            url = build_url(year_month)
+            try:
+                df = parse_feed(fetch_xml(url, verify_ssl=not insecure, session=_HTTP))
+            except requests.exceptions.SSLError:
+                df = parse_feed(fetch_xml(url, verify_ssl=False, session=_HTTP))
+            _save_df(os.path.join(out_dir, f"yields_{year_month}.csv"), df)
+    except Exception as e:
+        print(f"[refresh] Refreshing {year_month} failed: {e}", file=sys.stderr)
+        _release_regen(year_month)
+        return
+    # Already on an executor thread: build the YTD data inline rather than queueing it
+    _plot_month(
+        df,
+        year_month,
+        out_dir,
+        lambda: build_ytd_df(year_month, verify_ssl=not insecure, cache_dir=out_dir, session=_HTTP),
+    )
+
+def _build_ytd_plot(year_month: str, insecure: bool, out_dir: str) -> None:
+    """Build a missing YTD plot; the caller has claimed year_month as in flight."""
+    try:
+        df_ytd = build_ytd_df(year_month, verify_ssl=not insecure, cache_dir=out_dir, session=_HTTP)
+        plot_ytd(df_ytd, out_dir, year_month, show=False)
+    except Exception:
+        pass
+    finally:
+        # Pages of this year's other months may have been cached without the new image
+        _drop_cached_pages(year_month[:4])
+        _release_regen(year_month)
+
+def _latest_yields(df: pd.DataFrame) -> pd.Series:
+    """Most recent non-null yield per maturity label (NaN where a column has none)."""
+    labels = [label for label in _YIELD_COLUMNS[1:] if label in df.columns]
+    if df.empty:
+        return pd.Series(np.nan, index=labels, dtype=np.float64)
+    # One pass over the 2D block: the running count of valid cells peaks first at each
+    # column's last valid row (row 0, itself NaN, for an all-NaN column)
+    arr = df[labels].to_numpy(dtype=np.float64)
+    last = np.cumsum(~np.isnan(arr), axis=0).argmax(axis=0)
+    return pd.Series(arr[last, np.arange(arr.shape[1])], index=labels, dtype=np.float64)
+
+def _store_df(key: Tuple[str, float], df: pd.DataFrame) -> _DfEntry:
+    try:
+        metrics_df, summary_text = summarize(df)
+    except Exception:
+        metrics_df, summary_text = None, None
+    entry = (df, metrics_df, summary_text, _latest_yields(df))
+
+    with _DF_CACHE_LOCK:
+        _DF_CACHE[key] = entry
+        _DF_CACHE.move_to_end(key)
+        while len(_DF_CACHE) > _DF_CACHE_SIZE:
+            _DF_CACHE.popitem(last=False)
+    return entry
+
+def _load_df(csv_path: str) -> _DfEntry:
+    """Return (df, metrics_df, summary_text, latest) for a cached yields CSV.
+
+    summarize() runs once per file version and is shared by every route; metrics_df and
+    summary_text are None if it fails for this data. ``latest`` is _latest_yields(df).
+    The returned objects are shared between requests and must not be mutated.
+    """
+    key = (csv_path, os.stat(csv_path).st_mtime)
+    with _DF_CACHE_LOCK:
+        entry = _DF_CACHE.get(key)
+        if entry is not None:
+            _DF_CACHE.move_to_end(key)
+            return entry
+    return _store_df(key, load_yields(csv_path, columns=_YIELD_COLUMNS))
+
+def _save_df(csv_path: str, df: pd.DataFrame) -> _DfEntry:
+    """Write freshly fetched yields and seed the cache with them (and their summary)."""
+    save_yields(df, csv_path)
+    return _store_df((csv_path, os.stat(csv_path).st_mtime), df)
+
+# Browser cache lifetime (seconds) for generated plot images
+PLOTS_MAX_AGE = 3600
+
+# Plausible YYYYMM: Treasury's daily yield curve data starts in 1990
+_YM_RE = re.compile(r"((?:19|20)\d{2})(0[1-9]|1[0-2])")
+
+def _month_param(ym: Optional[str]) -> str:
+    """Return ``ym`` if it is a valid YYYYMM month, else the current month."""
+    if ym and _YM_RE.fullmatch(ym):
+        return ym
+    return build_month_arg(None)
+
+# Compiled once at import. render_template accepts Template objects, so context
+# processors and template signals still apply.
+_INDEX_TMPL = app.jinja_env.get_template("index.html")
+_INVEST_TMPL = app.jinja_env.get_template("invest.html")
+_LADDER_TMPL = app.jinja_env.get_template("ladder.html")
+_ERROR_TMPL = app.jinja_env.get_template("error.html")
 
 def cache_key(year_month: str) -> str:
     """Generate cache key for data"""
@@ -40,162 +269,282 @@ def is_cloud_run():
     """Detect if running in Cloud Run environment"""
     return os.environ.get("K_SERVICE") is not None
 
+def _startup_month() -> str:
+    """STARTUP_MONTH if it is a valid YYYYMM ("auto" or unset means the current month)."""
+    target_month = os.environ.get("STARTUP_MONTH", "auto")
+    if not target_month or target_month.lower() == "auto":
+        return build_month_arg(None)
+    if not _YM_RE.fullmatch(target_month):
+        print(f"[startup] Invalid STARTUP_MONTH '{target_month}', falling back to current", file=sys.stderr)
+        return build_month_arg(None)
+    return target_month
+
+def _startup_max_age() -> float:
+    """STARTUP_MAX_AGE in seconds: output younger than this is reused at startup."""
+    raw = os.environ.get("STARTUP_MAX_AGE", "3600")
+    try:
+        return float(raw)
+    except ValueError:
+        print(f"[startup] Invalid STARTUP_MAX_AGE '{raw}', using 3600", file=sys.stderr)
+        return 3600.0
+
+def _recent_data_exists(year_month: str, max_age: float = 3600) -> bool:
+    """True if the month's CSV exists and was written less than ``max_age`` seconds ago."""
+    csv_path = os.path.join(OUT_DIR, f"yields_{year_month}.csv")
+    try:
+        file_age = time.time() - os.stat(csv_path).st_mtime
+    except OSError:
+        return False
+    if file_age >= max_age:
+        return False
+    print(f"[startup] Using existing data (age: {file_age/60:.1f}min)", file=sys.stderr)
+    return True
+
 # Optimized startup for Cloud Run
-def _run_regen_optimized():
-    global _ready
+def _run_regen_optimized(target_month: str):
+    global _ready, _regen_proc, _regen_owner_pid, _regen_elsewhere
     try:
-        # In Cloud Run, be more conservative with startup generation
-        if is_cloud_run():
-            # Only regenerate if no recent data exists
-            target_month = os.environ.get("STARTUP_MONTH", "auto")
-            if target_month.lower() == "auto" or not target_month:
-                today = dt.date.today()
-                target_month = f"{today.year}{today.month:02d}"
-            
-            out_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out"))
-            csv_path = os.path.join(out_dir, f"yields_{target_month}.csv")
-            
-            # Skip startup regeneration if data exists and is recent
-            if os.path.exists(csv_path):
-                file_age = time.time() - os.path.getmtime(csv_path)
-                if file_age < 3600:  # Less than 1 hour old
-                    print(f"[startup] Using existing data (age: {file_age/60:.1f}min)", file=sys.stderr)
-                    _ready = True
-                    return
-        
-        # Validate month format
-        target_month = os.environ.get("STARTUP_MONTH", "auto")
-        if target_month.lower() == "auto" or not target_month:
-            today = dt.date.today()
-            target_month = f"{today.year}{today.month:02d}"
-        else:
-            if not (len(target_month) == 6 and target_month.isdigit()):
-                print(f"[startup] Invalid STARTUP_MONTH '{target_month}', falling back to current", file=sys.stderr)
-                today = dt.date.today()
-                target_month = f"{today.year}{today.month:02d}"
-        
-        from treas_analyzer import main as ta_main
-        ta_main.main(["--month", target_month, "--force-regenerate"])
-        print(f"[startup] Regeneration complete for {target_month}", file=sys.stderr)
-        _ready = True
+        # Multiple gunicorn workers each import this module; the first one to take the
+        # lock regenerates, the rest skip.
+        lock_fd = None
+        if fcntl is not None:
+            lock_fd = os.open(REGEN_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(lock_fd)
+                print("[startup] Regeneration already running in another worker; skipping", file=sys.stderr)
+                # Ready once that worker's child releases the lock (see _check_ready)
+                _regen_elsewhere = True
+                return
+
+        # Run the CLI in its own interpreter so its network and pandas/matplotlib work
+        # neither holds this process's GIL nor grows the serving process. The child
+        # inherits the locked descriptor, so the lock lasts until it exits.
+        try:
+            _regen_proc = subprocess.Popen(
+                [sys.executable, "-m", "treas_analyzer", "--month", target_month, "--force-regenerate"],
+                cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+                pass_fds=() if lock_fd is None else (lock_fd,),
+            )
+            _regen_owner_pid = os.getpid()
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
+        print(f"[startup] Regeneration started for {target_month} (pid {_regen_proc.pid})", file=sys.stderr)
     except Exception as e:
         print(f"[startup] Regeneration failed: {e}", file=sys.stderr)
         _ready = True  # Mark ready even on failure to prevent blocking
 
+def _regen_lock_held() -> bool:
+    """True while another open file (the regeneration child's) holds REGEN_LOCK_PATH."""
+    try:
+        fd = os.open(REGEN_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return False
+    except OSError:
+        return True
+    finally:
+        os.close(fd)  # also drops the probe's own lock
+
+def _check_ready() -> bool:
+    """Mark the app ready once the startup regeneration subprocess has exited."""
+    global _ready
+    if _ready or (_regen_proc is None and not _regen_elsewhere):
+        return _ready
+    if _regen_proc is not None and _regen_owner_pid == os.getpid():
+        rc = _regen_proc.poll()
+        if rc is not None:
+            status = "complete" if rc == 0 else f"failed (exit {rc})"
+            print(f"[startup] Regeneration {status}", file=sys.stderr)
+            _ready = True  # Ready even on failure to prevent blocking
+    elif fcntl is None or not _regen_lock_held():
+        # A worker forked after the spawn (gunicorn --preload), or one that found another
+        # worker regenerating, can't poll() a child that isn't its own (ECHILD reads as
+        # exit 0); the child holds the lock until it exits
+        print("[startup] Regeneration finished", file=sys.stderr)
+        _ready = True
+    return _ready
+
 def _startup_regenerate_async():
-    if os.environ.get("DISABLE_STARTUP_REGENERATE") == "1":
-        global _ready
+    global _ready
+    # Serve-only replicas (e.g. sharing a mounted out/) never regenerate at startup
+    if os.environ.get("DISABLE_STARTUP_REGENERATE") == "1" or os.environ.get("READ_ONLY") == "1":
         _ready = True
         return
-    t = threading.Thread(target=_run_regen_optimized, name="regen-thread", daemon=True)
-    t.start()
+    target_month = _startup_month()
+    max_age = _startup_max_age()
+    # Another process (or an earlier instance on the same out/) generated this month recently
+    marker_age = generated_marker_age(OUT_DIR, target_month)
+    if marker_age is not None and marker_age < max_age:
+        print(f"[startup] Month {target_month} generated {marker_age/60:.1f}min ago; skipping", file=sys.stderr)
+        _ready = True
+        return
+    # In Cloud Run, be more conservative: skip regeneration (and be ready at once) when
+    # the month's CSV was written within STARTUP_MAX_AGE
+    if is_cloud_run() and _recent_data_exists(target_month, max_age):
+        _ready = True
+        return
+    _run_regen_optimized(target_month)
 
 _startup_regenerate_async()
 
 # Health and readiness endpoints for Cloud Run
+# (second, JSON body) last served by /healthz
+_health_body: Tuple[int, bytes] = (0, b"")
+
 @app.route("/health")
-@app.route("/healthz")  
+@app.route("/healthz")
 def health():
     """Health check endpoint"""
-    return jsonify({"status": "ok", "time": dt.datetime.utcnow().isoformat() + "Z"})
+    # Probes can arrive many times a second; the body only changes once a second
+    global _health_body
+    now = int(time.time())
+    if _health_body[0] != now:
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _health_body = (now, _json_bytes({"status": "ok", "time": stamp}) + b"\n")
+    return _health_body[1], 200, {"Content-Type": "application/json"}
 
 @app.route("/ready")
 def ready():
     """Readiness check endpoint"""
-    return jsonify({
-        "status": "ready" if _ready else "starting",
-        "ready": _ready,
-        "time": dt.datetime.utcnow().isoformat() + "Z"
-    }), 200 if _ready else 503
+    is_ready = _check_ready()
+    body = _json_bytes({
+        "ready": is_ready,
+        "status": "ready" if is_ready else "starting",
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    })
+    return body + b"\n", 200 if is_ready else 503, {"Content-Type": "application/json"}
 
 
 @app.route("/")
 def index():
     # Check cache first for faster response
-    ym = request.args.get("month")
-    try:
-        year_month = build_month_arg(ym)
-    except Exception:
-        year_month = build_month_arg(None)
+    year_month = _month_param(request.args.get("month"))
     
     cache_k = cache_key(year_month)
-    
-    # Try to serve from cache if available
-    if cache_k in _cache:
-        cached_data = _cache[cache_k]
-        # Check if cache is still fresh (within 30 minutes)
-        if time.time() - cached_data['timestamp'] < 1800:
-            return render_template(
-                "index.html",
-                **cached_data['template_data']
-            )
+    out_dir = OUT_DIR
+    csv_path = os.path.join(out_dir, f"yields_{year_month}.csv")
+
+    # Try to serve the rendered page from cache (entries expire after 30 minutes)
+    with _cache_lock:
+        cached = _cache.get(cache_k)
+    if cached is not None:
+        try:
+            if os.stat(csv_path).st_mtime == cached[0]:
+                return Response(cached[1], mimetype="text/html")
+        except OSError:
+            pass
 
     url = build_url(year_month)
     insecure = request.args.get("insecure") == "1"
 
-    out_dir = os.path.join(os.path.dirname(__file__), "..", "out")
-    out_dir = os.path.abspath(out_dir)
-    os.makedirs(out_dir, exist_ok=True)
-
-    # Optimized file existence check
-    csv_path = os.path.join(out_dir, f"yields_{year_month}.csv")
+    # Optimized file existence check: one directory listing, then set lookups
     p_all = os.path.join(out_dir, f"yields_all_{year_month}.png")
     p_facets = os.path.join(out_dir, f"yields_facets_{year_month}.png")
     p_ytd = os.path.join(out_dir, f"yields_ytd_{year_month[:4]}.png")
-    
-    files_exist = os.path.exists(csv_path) and os.path.exists(p_all) and os.path.exists(p_facets)
-    regen_needed = should_regenerate(out_dir, year_month, files_exist)
+
+    existing = list_out_dir(out_dir)
+    files_exist = {os.path.basename(p) for p in (csv_path, p_all, p_facets)} <= existing
+    # A month being regenerated in the background is served from its CSV
+    was_pending = _regen_pending(year_month)
+    regen_needed = not was_pending and should_regenerate(out_dir, year_month, files_exist, existing)
+    metrics_df = None
+    wrote_files = False
 
     # Cloud Run optimization: prefer existing data over regeneration during request
     if is_cloud_run() and files_exist and not regen_needed:
         # Load cached data efficiently in Cloud Run
         try:
-            df = pd.read_csv(csv_path, parse_dates=["Date"]).assign(Date=lambda s: s["Date"].dt.date)
+            df, metrics_df, summary_text, _ = _load_df(csv_path)
         except Exception as e:
-            return render_template("error.html", error=f"Failed to load cached CSV: {e}"), 500
-    elif regen_needed:
+            return render_template(_ERROR_TMPL, error=f"Failed to load cached CSV: {e}"), 500
+    elif regen_needed and os.path.basename(csv_path) in existing:
+        # Stale-while-revalidate: serve the existing CSV now and refresh it in the
+        # background; only a month with no CSV at all blocks on the fetch below
+        if _claim_regen(year_month):
+            _executor.submit(_refresh_month, year_month, insecure, out_dir)
         try:
-            xml_text = fetch_xml(url, verify_ssl=not insecure)
-            df = parse_feed(xml_text)
-        except requests.exceptions.SSLError:
-            try:
-                xml_text = fetch_xml(url, verify_ssl=False)
-                df = parse_feed(xml_text)
-            except Exception as e:
-                return render_template("error.html", error=f"SSL error and insecure fallback failed: {e}"), 500
+            df, metrics_df, summary_text, _ = _load_df(csv_path)
         except Exception as e:
-            return render_template("error.html", error=str(e)), 500
-        # Write artifacts
-        df.to_csv(csv_path, index=False)
-        pngs = plot_all(df, out_dir, year_month, show=False)
-        # Attempt to also build YTD plot (non-fatal if it fails)
-        try:
-            df_ytd = build_ytd_df(year_month, verify_ssl=not insecure)
-            plot_ytd(df_ytd, out_dir, year_month, show=False)
-        except Exception:
-            pass
-        write_generated_marker(out_dir, year_month)
+            return render_template(_ERROR_TMPL, error=f"Failed to load cached CSV: {e}"), 500
+    elif regen_needed:
+        # Serialize regeneration per month so concurrent misses fetch and plot only once
+        with _regen_lock(year_month):
+            # Another request may have regenerated this month while we waited
+            existing = list_out_dir(out_dir)
+            files_exist = {os.path.basename(p) for p in (csv_path, p_all, p_facets)} <= existing
+            regen_needed = not _regen_pending(year_month) and should_regenerate(
+                out_dir, year_month, files_exist, existing
+            )
+            if not regen_needed:
+                try:
+                    df, metrics_df, summary_text, _ = _load_df(csv_path)
+                except Exception as e:
+                    return render_template(_ERROR_TMPL, error=f"Failed to load cached CSV: {e}"), 500
+            else:
+                # Both fetches are network-bound: start the YTD one in the background while this
+                # thread fetches the month. Plotting below stays on this thread.
+                fut_ytd = _executor.submit(
+                    build_ytd_df, year_month, verify_ssl=not insecure, cache_dir=out_dir, session=_HTTP
+                )
+                try:
+                    xml_text = fetch_xml(url, verify_ssl=not insecure, session=_HTTP)
+                    df = parse_feed(xml_text)
+                except requests.exceptions.SSLError:
+                    try:
+                        xml_text = fetch_xml(url, verify_ssl=False, session=_HTTP)
+                        df = parse_feed(xml_text)
+                    except Exception as e:
+                        return render_template(_ERROR_TMPL, error=f"SSL error and insecure fallback failed: {e}"), 500
+                except Exception as e:
+                    return render_template(_ERROR_TMPL, error=str(e)), 500
+                # Write the data now; plotting is CPU-heavy, so it runs in the background
+                # and later requests pick the images up. Claim the month before the CSV
+                # appears, or a concurrent request would see it without plots and queue a
+                # refresh. If another job already holds the claim, it does the plotting.
+                claimed = _claim_regen(year_month)
+                try:
+                    _, metrics_df, summary_text, _ = _save_df(csv_path, df)
+                except Exception:
+                    if claimed:
+                        _release_regen(year_month)
+                    raise
+                if claimed:
+                    _claim_ytd(year_month[:4])  # the YTD plot is part of this job
+                    _executor.submit(_plot_month, df, year_month, out_dir, fut_ytd.result)
+                wrote_files = True
     else:
         # Load cached data efficiently
         try:
-            df = pd.read_csv(csv_path, parse_dates=["Date"]).assign(Date=lambda s: s["Date"].dt.date)
+            df, metrics_df, summary_text, _ = _load_df(csv_path)
         except Exception as e:
-            return render_template("error.html", error=f"Failed to load cached CSV: {e}"), 500
+            return render_template(_ERROR_TMPL, error=f"Failed to load cached CSV: {e}"), 500
         
-        # In Cloud Run, skip YTD generation during request to reduce latency
+        # In Cloud Run, skip YTD generation during request to reduce latency. Elsewhere a
+        # missing YTD plot is built in the background (once per year per process); the
+        # month counts as pending until it is done, so the page refreshes to pick it up.
+        # If the month's claim is taken, the job holding it builds the YTD plot too.
         if not is_cloud_run():
-            ytd_path = os.path.join(out_dir, f"yields_ytd_{year_month[:4]}.png")
-            if not os.path.exists(ytd_path):
-                try:
-                    df_ytd = build_ytd_df(year_month, verify_ssl=not insecure)
-                    plot_ytd(df_ytd, out_dir, year_month, show=False)
-                except Exception:
-                    pass
-
-    metrics_df, summary_text = summarize(df)
-    # Best overall maturity (lowest CompositeRank)
+            if (
+                os.path.basename(p_ytd) not in existing
+                and _claim_ytd(year_month[:4])
+                and _claim_regen(year_month)
+            ):
+                _executor.submit(_build_ytd_plot, year_month, insecure, out_dir)
+
+    # summarize() already ran (once per file version) in _load_df/_save_df
+    if metrics_df is None:
+        return render_template(_ERROR_TMPL, error="Failed to summarize yield data"), 500
+    # Top 5 by CompositeRank (partial sort); the first row is the best overall maturity
+    top5_df = metrics_df.nsmallest(5, "CompositeRank")[
+        ["Maturity", "CurrentYieldPct", "TrendBpsPerMonth", "CompositeRank"]
+    ]
     try:
-        best_row = metrics_df.sort_values(["CompositeRank"]).iloc[0]
+        best_row = top5_df.iloc[0]
         best_overall = {
             "Maturity": best_row["Maturity"],
             "CurrentYieldPct": float(best_row["CurrentYieldPct"]),
@@ -204,16 +553,29 @@ def index():
     except Exception:
         best_overall = None
 
-    latest_date = df.iloc[-1]["Date"]
-    top5 = (
-        metrics_df.sort_values(["CompositeRank"]).head(5)[
-            ["Maturity", "CurrentYieldPct", "TrendBpsPerMonth", "CompositeRank"]
-        ].to_dict(orient="records")
-    )
+    latest_date = df["Date"].iat[-1]
+    top5 = list(top5_df.itertuples(index=False))
 
-    # Convert relative paths for serving via static route
+    # Convert relative paths for serving via static route. Pending plots are checked
+    # before listing: if none are pending now, the (re)listing below is complete.
+    plots_pending = _regen_pending(year_month)
+    if wrote_files or was_pending:
+        existing = list_out_dir(out_dir)
     pngs_ordered = [p_all, p_ytd, p_facets]
-    png_files = [os.path.basename(p) for p in pngs_ordered if os.path.exists(p)]
+    # (name, version) per listed plot. Each image is versioned by its own mtime: plots are
+    # rewritten in the background after the CSV, and the YTD plot is shared by the year.
+    png_files = []
+    for p in pngs_ordered:
+        name = os.path.basename(p)
+        if name in existing:
+            try:
+                png_files.append((name, os.stat(p).st_mtime_ns))
+            except OSError:
+                pass
+    try:
+        csv_mtime = os.stat(csv_path).st_mtime
+    except OSError:
+        csv_mtime = 0.0
 
     # Prepare template data
     template_data = {
@@ -223,20 +585,16 @@ def index():
         "summary_text": summary_text,
         "best_overall": best_overall,
         "top5": top5,
+        "plots_pending": plots_pending,
     }
     
-    # Cache the response for faster subsequent requests
-    _cache[cache_k] = {
-        'timestamp': time.time(),
-        'template_data': template_data
-    }
-    
-    # Keep cache size reasonable
-    if len(_cache) > 10:
-        oldest_key = min(_cache.keys(), key=lambda k: _cache[k]['timestamp'])
-        del _cache[oldest_key]
+    # Cache the rendered page for faster subsequent requests, once its plots exist
+    html = render_template(_INDEX_TMPL, **template_data).encode("utf-8")
+    if not plots_pending:
+        with _cache_lock:
+            _cache[cache_k] = (csv_mtime, html)
 
-    return render_template("index.html", **template_data)
+    return Response(html, mimetype="text/html")
 
 
 @app.route("/invest", methods=["GET", "POST"])
@@ -248,11 +606,7 @@ def invest():
     This ignores compounding, price fluctuations, reinvestment, tax, and day-count conventions.
     """
     # Determine month (same logic as index); default current month
-    ym = request.args.get("month")
-    try:
-        year_month = build_month_arg(ym)
-    except Exception:
-        year_month = build_month_arg(None)
+    year_month = _month_param(request.args.get("month"))
 
     # Amount: support both GET query (?amount=) and POST form
     amt_raw = request.values.get("amount", "10000").replace(",", "").strip()
@@ -268,67 +622,54 @@ def invest():
 
     url = build_url(year_month)
     insecure = request.args.get("insecure") == "1"
-    out_dir = os.path.join(os.path.dirname(__file__), "..", "out")
-    out_dir = os.path.abspath(out_dir)
-    os.makedirs(out_dir, exist_ok=True)
+    out_dir = OUT_DIR
 
     csv_path = os.path.join(out_dir, f"yields_{year_month}.csv")
-    # If cached CSV missing, fetch minimally (no plots required here)
-    if not os.path.exists(csv_path):
+    # Load the cached CSV; _load_df's stat doubles as the existence check
+    try:
+        df, metrics_df, _, latest = _load_df(csv_path)
+    except FileNotFoundError:
+        # If cached CSV missing, fetch minimally (no plots required here)
         try:
-            xml_text = fetch_xml(url, verify_ssl=not insecure)
+            xml_text = fetch_xml(url, verify_ssl=not insecure, session=_HTTP)
             df = parse_feed(xml_text)
-            df.to_csv(csv_path, index=False)
+            _, metrics_df, _, latest = _save_df(csv_path, df)
             write_generated_marker(out_dir, year_month)
         except Exception as e:
-            return render_template("error.html", error=f"Failed to fetch data: {e}"), 500
-    else:
-        try:
-            df = pd.read_csv(csv_path, parse_dates=["Date"]).assign(Date=lambda s: s["Date"].dt.date)
-        except Exception as e:
-            return render_template("error.html", error=f"Failed to load cached data: {e}"), 500
+            return render_template(_ERROR_TMPL, error=f"Failed to fetch data: {e}"), 500
+    except Exception as e:
+        return render_template(_ERROR_TMPL, error=f"Failed to load cached data: {e}"), 500
 
-    latest_date = df.iloc[-1]["Date"] if not df.empty else None
+    latest_date = df["Date"].iat[-1] if not df.empty else None
 
-    # Determine best maturity by composite rank for highlight
+    # Determine best maturity by composite rank for highlight (from the cached summary)
     try:
-        metrics_df, _ = summarize(df)
-        best_maturity = metrics_df.sort_values(["CompositeRank"]).iloc[0]["Maturity"]
+        best_maturity = metrics_df.loc[metrics_df["CompositeRank"].idxmin(), "Maturity"]
     except Exception:
         best_maturity = None
 
     # Build return table
     rows = []
     if amount > 0 and not error:
-        latest_row = df.iloc[-1]
-        for xml_field, (label, years) in MATURITY_FIELDS.items():
-            if label not in df.columns:
-                continue
-            # Use the most recent non-null value
-            series = df[label].dropna()
-            if series.empty:
-                continue
-            yld = float(series.iloc[-1])  # already annualized percent
-            if years and years > 0:
-                interest = amount * (yld / 100.0) * years  # simple interest over full term
-                total_value = amount + interest
-            else:
-                interest = float('nan')
-                total_value = float('nan')
-            rows.append({
-                "Maturity": label,
-                "Years": years,
-                "YieldPct": yld,
-                "Interest": interest,
-                "Total": total_value,
-            })
-
-        # Order rows by defined order
-        order_index = {m: i for i, m in enumerate(MATURITY_ORDER)}
-        rows.sort(key=lambda r: order_index.get(r["Maturity"], 999))
+        # Most recent non-null value per maturity (cached with the frame); the
+        # interest/total columns are then computed for all maturities at once
+        present = [i for i, label in enumerate(_INVEST_LABELS) if label in latest.index]
+        labels = [_INVEST_LABELS[i] for i in present]
+        ylds = latest[labels].to_numpy(dtype=np.float64)  # annualized percent
+        years = _INVEST_YEARS[present]
+        interest = amount * (ylds / 100.0) * years  # simple interest over full term
+        total = amount + interest
+        has_yield = ~np.isnan(ylds)
+        rows = [
+            {"Maturity": label, "Years": yrs, "YieldPct": yld, "Interest": intr, "Total": tot}
+            for label, yrs, yld, intr, tot, ok in zip(
+                labels, years.tolist(), ylds.tolist(), interest.tolist(), total.tolist(), has_yield
+            )
+            if ok
+        ]
 
     return render_template(
-        "invest.html",
+        _INVEST_TMPL,
         amount=amount,
         amount_display=f"{amount:,.2f}" if amount else "",
         error=error,
@@ -347,11 +688,7 @@ def ladder():
     Supports different allocation strategies.
     """
     # Determine month (same logic as index)
-    ym = request.args.get("month")
-    try:
-        year_month = build_month_arg(ym)
-    except Exception:
-        year_month = build_month_arg(None)
+    year_month = _month_param(request.args.get("month"))
 
     # Parse parameters
     total_amount_raw = request.values.get("total_amount", "25000").replace(",", "").strip()
@@ -391,44 +728,40 @@ def ladder():
 
     url = build_url(year_month)
     insecure = request.args.get("insecure") == "1"
-    out_dir = os.path.join(os.path.dirname(__file__), "..", "out")
-    out_dir = os.path.abspath(out_dir)
-    os.makedirs(out_dir, exist_ok=True)
+    out_dir = OUT_DIR
 
     csv_path = os.path.join(out_dir, f"yields_{year_month}.csv")
-    # If cached CSV missing, fetch minimally
-    if not os.path.exists(csv_path):
+    # Load the cached CSV; _load_df's stat doubles as the existence check
+    try:
+        df, _, _, latest = _load_df(csv_path)
+    except FileNotFoundError:
+        # If cached CSV missing, fetch minimally
         try:
-            xml_text = fetch_xml(url, verify_ssl=not insecure)
+            xml_text = fetch_xml(url, verify_ssl=not insecure, session=_HTTP)
             df = parse_feed(xml_text)
-            df.to_csv(csv_path, index=False)
+            _, _, _, latest = _save_df(csv_path, df)
             write_generated_marker(out_dir, year_month)
         except Exception as e:
-            return render_template("error.html", error=f"Failed to fetch data: {e}"), 500
-    else:
-        try:
-            df = pd.read_csv(csv_path, parse_dates=["Date"]).assign(Date=lambda s: s["Date"].dt.date)
-        except Exception as e:
-            return render_template("error.html", error=f"Failed to load cached data: {e}"), 500
+            return render_template(_ERROR_TMPL, error=f"Failed to fetch data: {e}"), 500
+    except Exception as e:
+        return render_template(_ERROR_TMPL, error=f"Failed to load cached data: {e}"), 500
 
-    latest_date = df.iloc[-1]["Date"] if not df.empty else None
+    latest_date = df["Date"].iat[-1] if not df.empty else None
 
     # Build ladder results
     ladder_results = None
     if total_amount > 0 and not error:
         # Get available maturities (filter out the shortest ones for ladder)
         available_maturities = []
-        latest_row = df.iloc[-1]
-        for xml_field, (label, years) in MATURITY_FIELDS.items():
-            if label not in df.columns or years is None:
+        for label, years in _LADDER_ROWS:
+            if label not in latest.index:
                 continue
             # If user selected specific durations, only include those
             if durations and label not in durations:
                 continue
-            series = df[label].dropna()
-            if series.empty:
+            yld = float(latest[label])
+            if np.isnan(yld):
                 continue
-            yld = float(series.iloc[-1])
             available_maturities.append({
                 "maturity": label,
                 "years": years,
@@ -449,64 +782,56 @@ def ladder():
         selected_labels = [m["maturity"] for m in selected_maturities]
         selected_maturities.sort(key=lambda x: x["years"])  # display/order
         
-        # Apply allocation strategy
+        # Apply allocation strategy (vectorized over the selected rungs)
+        years = np.array([m["years"] for m in selected_maturities], dtype=np.float64)
+        ylds = np.array([m["yield_pct"] for m in selected_maturities], dtype=np.float64)
         if strategy == "equal":
             # Equal allocation
-            weights = [1.0] * len(selected_maturities)
+            weights = np.ones_like(years)
         elif strategy == "yield_weighted":
             # Weight by relative yield (original approach):
             # use differences from the lowest yield to avoid overly peaky allocations
-            ylds = [m["yield_pct"] for m in selected_maturities]
-            if ylds:
-                min_y = min(ylds)
-                weights = [max(y - min_y, 0.0) for y in ylds]
-                # If all yields equal (sum == 0), fall back to equal weighting
-                if sum(weights) == 0:
-                    weights = [1.0] * len(selected_maturities)
-            else:
-                weights = [1.0] * len(selected_maturities)
+            weights = np.maximum(ylds - ylds.min(), 0.0) if ylds.size else np.ones_like(ylds)
+            # If all yields equal (sum == 0), fall back to equal weighting
+            if not weights.any():
+                weights = np.ones_like(ylds)
         elif strategy == "short_weighted":
             # More weight to shorter terms
-            weights = [1.0 / (m["years"] ** 0.5) for m in selected_maturities]
+            weights = 1.0 / np.sqrt(years)
         elif strategy == "long_weighted":
             # More weight to longer terms
-            weights = [m["years"] ** 0.5 for m in selected_maturities]
+            weights = np.sqrt(years)
         elif strategy == "custom" and custom_allocations:
             # Use custom allocations (convert percentages to weights)
-            weights = [alloc / 100.0 for alloc in custom_allocations[:len(selected_maturities)]]
+            weights = np.array(custom_allocations[:len(selected_maturities)], dtype=np.float64) / 100.0
         else:
-            weights = [1.0] * len(selected_maturities)
+            weights = np.ones_like(years)
         
         # Normalize weights (except for custom which should already be normalized)
         if strategy != "custom":
-            total_weight = sum(weights)
-            weights = [w / total_weight for w in weights]
+            weights = weights / weights.sum()
         
         # Calculate allocations
-        rungs_data = []
-        total_invested = 0
-        total_annual_interest = 0
-        weighted_yield_sum = 0
-        weighted_years_sum = 0
-        
-        for i, maturity in enumerate(selected_maturities):
-            amount = total_amount * weights[i]
-            annual_interest = amount * (maturity["yield_pct"] / 100.0)
-            maturity_value = amount + (annual_interest * maturity["years"])
-            
-            rungs_data.append({
-                "maturity": maturity["maturity"],
-                "years": maturity["years"],
-                "yield_pct": maturity["yield_pct"],
+        amounts = total_amount * weights
+        annual_interest = amounts * (ylds / 100.0)
+        maturity_values = amounts + annual_interest * years
+        rungs_data = [
+            {
+                "maturity": m["maturity"],
+                "years": m["years"],
+                "yield_pct": m["yield_pct"],
                 "amount": amount,
-                "annual_interest": annual_interest,
-                "maturity_value": maturity_value
-            })
-            
-            total_invested += amount
-            total_annual_interest += annual_interest
-            weighted_yield_sum += maturity["yield_pct"] * amount
-            weighted_years_sum += maturity["years"] * amount
+                "annual_interest": interest,
+                "maturity_value": value,
+            }
+            for m, amount, interest, value in zip(
+                selected_maturities, amounts.tolist(), annual_interest.tolist(), maturity_values.tolist()
+            )
+        ]
+        total_invested = float(amounts.sum())
+        total_annual_interest = float(annual_interest.sum())
+        weighted_yield_sum = float(ylds @ amounts)
+        weighted_years_sum = float(years @ amounts)
         
         # Sort rungs by years for display
         rungs_data.sort(key=lambda x: x["years"])
@@ -520,7 +845,7 @@ def ladder():
         }
 
     return render_template(
-        "ladder.html",
+        _LADDER_TMPL,
         total_amount=total_amount,
         rungs=rungs,
         strategy=strategy,
@@ -536,8 +861,14 @@ def ladder():
 
 @app.route("/plots/<path:filename>")
 def plots(filename: str):
-    out_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "out"))
-    return send_from_directory(out_dir, filename)
+    out_dir = OUT_DIR
+    # Conditional (ETag/Last-Modified) responses let browsers revalidate with a 304.
+    # index.html appends ?v=<image mtime>, so a rewritten plot (including the YTD plot
+    # shared by a year's months) gets a new URL and a short public max-age is safe.
+    resp = send_from_directory(out_dir, filename, conditional=True, etag=True, max_age=PLOTS_MAX_AGE)
+    resp.cache_control.public = True
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
 
 
 if __name__ == "__main__":
@@ -545,6 +876,3 @@ if __name__ == "__main__":
     # Disable debug mode in production
     debug_mode = not is_cloud_run()
     app.run(host="0.0.0.0", port=port, debug=debug_mode)
-
-
-# Remove duplicate healthz endpoint - using the one defined earlier